@@ -2,8 +2,6 @@ import logging
 from typing import Any
 
 from .charge_point_base import ChargePointBase
-from .charge_point_v16 import ChargePointV16
-from .charge_point_v201 import ChargePointV201
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -52,10 +50,16 @@ class ChargePointFactory:
         # Normalize version string
         version = version.strip()
 
+        # Each OCPP version module pulls in its own ocpp message package, so only the
+        # version actually in use is imported
         if version == "1.6":
+            from .charge_point_v16 import ChargePointV16
+
             _LOGGER.info(f"Creating OCPP 1.6 ChargePoint for {cp_id}")
             return ChargePointV16(cp_id, connection, manager, ha_bridge, event_logger)
         if version == "2.0.1":
+            from .charge_point_v201 import ChargePointV201
+
             _LOGGER.info(f"Creating OCPP 2.0.1 ChargePoint for {cp_id}")
             return ChargePointV201(cp_id, connection, manager, ha_bridge, event_logger)
         raise ValueError(f"Unsupported OCPP version: {version}")
@@ -187,7 +191,11 @@ class OCPPServiceFactory:
         """
         # For service clients, we use the same ChargePoint classes but with different configuration
         if version == "1.6":
+            from .charge_point_v16 import ChargePointV16
+
             return ChargePointV16(service_id, connection, manager)
         if version == "2.0.1":
+            from .charge_point_v201 import ChargePointV201
+
             return ChargePointV201(service_id, connection, manager)
         raise ValueError(f"Unsupported OCPP version for service client: {version}")
@@ -1,8 +1,14 @@
 import asyncio
 import logging
-from typing import TYPE_CHECKING, Any, cast
+import random
+import ssl
+from collections.abc import Awaitable, Callable, Mapping
+from dataclasses import dataclass
+from types import MappingProxyType
+from typing import TYPE_CHECKING, Any, ClassVar, cast
 
 import websockets
+from ocpp.exceptions import OCPPError
 
 if TYPE_CHECKING:
     from websockets.typing import Subprotocol
@@ -13,6 +19,99 @@ from .charge_point_factory import OCPPServiceFactory
 
 _LOGGER = logging.getLogger(__name__)
 
+# Connection retry policy: exponential backoff from 200ms, capped at 1s, with jitter
+_CONNECT_ATTEMPTS = 3
+_BACKOFF_BASE = 0.2
+_BACKOFF_CAP = 1.0
+# Connect failures worth retrying; an HTTP rejection is only retried for 5xx responses
+_RETRYABLE_CONNECT_ERRORS = (
+    OSError,
+    TimeoutError,
+    websockets.ConnectionClosed,
+    websockets.InvalidStatus,
+)
+
+# One shared keepalive pings every service connection instead of a timer per connection
+_KEEPALIVE_INTERVAL = 30
+_KEEPALIVE_TIMEOUT = 10
+
+# Meter events arriving within this window are merged per connector before broadcast
+_METER_COALESCE_WINDOW = 0.05
+
+# Remote actions an OCPP service may forward to the charger:
+# action -> (charge point method, ((parameter, default), ...))
+_REMOTE_ACTIONS: dict[str, tuple[str, tuple[tuple[str, Any], ...]]] = {
+    "RemoteStartTransaction": (
+        "send_remote_start_transaction",
+        (("connector_id", 1), ("id_tag", None)),
+    ),
+    "RemoteStopTransaction": ("send_remote_stop_transaction", (("transaction_id", None),)),
+}
+
+
+# WebSocket subprotocol offered for each OCPP version
+_SUBPROTOCOLS: dict[str, tuple[Subprotocol, ...]] = {
+    "1.6": (cast("Subprotocol", "ocpp1.6"),),
+    "2.0.1": (cast("Subprotocol", "ocpp2.0.1"),),
+}
+
+# Shared read-only headers for every service that connects without authentication
+_NO_AUTH_HEADERS: Mapping[str, str] = MappingProxyType({})
+
+# Failures of a forwarded call to the charger that are reported as an unsuccessful request;
+# anything else is a bug and propagates
+_FORWARD_ERRORS = (TimeoutError, ConnectionError, OCPPError, websockets.WebSocketException)
+
+
+@dataclass(slots=True)
+class ServiceClient:
+    """An outbound OCPP service connection and the client speaking over it."""
+
+    service_id: str
+    charge_point: Any = None
+    connection: Any = None
+    ocpp_version: str = "1.6"
+    connected: bool = False
+    authenticated: bool = False
+
+    def mark_disconnected(self, _task: asyncio.Task[Any] | None = None) -> None:
+        """Record that the connection is gone; also usable as a task done callback."""
+        self.connected = False
+
+
+async def _receive_passively(_client: ServiceClient, _event: dict[str, Any]) -> None:
+    """Leave the event to the charge point client, which handles the actual sending."""
+
+
+# Charger event type -> coroutine forwarding it to one OCPP service; services currently
+# receive status, meter, transaction, heartbeat and boot events passively
+_EVENT_HANDLERS: dict[str, Callable[[ServiceClient, dict[str, Any]], Awaitable[None]]] = {
+    "status": _receive_passively,
+    "meter": _receive_passively,
+    "transaction_started": _receive_passively,
+    "transaction_stopped": _receive_passively,
+    "heartbeat": _receive_passively,
+    "boot": _receive_passively,
+}
+
+
+def _prepare_headers(service_config: dict[str, Any]) -> Mapping[str, str]:
+    """Build the authentication headers for an OCPP service config."""
+    auth_type = service_config.get("auth_type")
+    if auth_type == "basic":
+        username = service_config.get("username")
+        password = service_config.get("password")
+        if username and password:
+            import base64
+
+            credentials = base64.b64encode(f"{username}:{password}".encode()).decode()
+            return {"Authorization": f"Basic {credentials}"}
+    elif auth_type == "token":
+        token = service_config.get("token")
+        if token:
+            return {"Authorization": f"Bearer {token}"}
+    return _NO_AUTH_HEADERS
+
 
 class OCPPServiceManager:
     """
@@ -21,12 +120,36 @@ class OCPPServiceManager:
     Supports both OCPP 1.6 and 2.0.1 versions.
     """
 
+    # websockets.connect options common to every service connection; pings come from
+    # the shared keepalive loop, not a per-connection timer
+    _BASE_WS_KWARGS: ClassVar[Mapping[str, Any]] = MappingProxyType(
+        {"ping_interval": None, "ping_timeout": None}
+    )
+
     def __init__(self, config: Any, backend_manager: Any = None) -> None:
         self.config = config
         self.backend_manager = backend_manager
-        self.services: dict[str, Any] = {}
+        self.services: dict[str, ServiceClient] = {}
         self._connection_tasks: dict[str, asyncio.Task[Any]] = {}
         self._background_tasks: set[asyncio.Task[Any]] = set()
+        # Meter events waiting for the next coalesced broadcast, keyed by their non-values fields
+        self._pending_meter: dict[tuple[Any, ...], dict[str, Any]] = {}
+        self._meter_flush_task: asyncio.Task[Any] | None = None
+        self._keepalive_task: asyncio.Task[Any] | None = None
+        # Active charge point that forwarded service actions go to; set by the charger handler
+        self._cp: Any = None
+        # One TLS context for every wss:// service so CA loading and session reuse are shared
+        self._ssl_context: ssl.SSLContext | None = None
+
+    def set_charge_point(self, cp: Any) -> None:
+        """Record the charge point that forwarded service actions are sent to."""
+        self._cp = cp
+
+    def _get_ssl_context(self) -> ssl.SSLContext:
+        """Return the TLS context shared by all secure service connections."""
+        if self._ssl_context is None:
+            self._ssl_context = ssl.create_default_context()
+        return self._ssl_context
 
     async def start_services(self) -> None:
         """Start connections to all configured OCPP services."""
@@ -34,10 +157,15 @@ class OCPPServiceManager:
             _LOGGER.info("No OCPP services configured")
             return
 
-        for service_config in self.config.ocpp_services:
-            service_id = service_config.get("id")
-            if service_id and service_config.get("enabled", True):
-                await self.connect_service(service_id, service_config)
+        # Connect concurrently so startup waits for the slowest handshake, not their sum
+        await asyncio.gather(
+            *(
+                self.connect_service(service_config["id"], service_config)
+                for service_config in self.config.ocpp_services
+                if service_config.get("id") and service_config.get("enabled", True)
+            ),
+            return_exceptions=True,
+        )
 
     async def connect_service(self, service_id: str, service_config: dict[str, Any]) -> None:
         """Connect to a specific OCPP service."""
@@ -50,68 +178,117 @@ class OCPPServiceManager:
             # Determine OCPP version (default to 1.6 if not specified)
             version = service_config.get("version", "1.6")
 
-            # Handle authentication
-            auth_headers = {}
-            if service_config.get("auth_type") == "basic":
-                username = service_config.get("username")
-                password = service_config.get("password")
-                if username and password:
-                    import base64
-
-                    credentials = base64.b64encode(f"{username}:{password}".encode()).decode()
-                    auth_headers["Authorization"] = f"Basic {credentials}"
-            elif service_config.get("auth_type") == "token":
-                token = service_config.get("token")
-                if token:
-                    auth_headers["Authorization"] = f"Bearer {token}"
-
-            # Set WebSocket subprotocol based on version
-            subprotocols: list[Subprotocol] = []
-            if version == "1.6":
-                subprotocols = [cast("Subprotocol", "ocpp1.6")]
-            elif version == "2.0.1":
-                subprotocols = [cast("Subprotocol", "ocpp2.0.1")]
+            # Build the auth headers once; every retry attempt below reuses them
+            auth_headers = _prepare_headers(service_config)
 
             # Create WebSocket connection
-            connection = await websockets.connect(
+            connect_kwargs: dict[str, Any] = {}
+            if url.startswith("wss://"):
+                connect_kwargs["ssl"] = self._get_ssl_context()
+            connection = await self._connect_with_retry(
+                service_id,
                 url,
-                extra_headers=auth_headers,
-                subprotocols=subprotocols,
-                ping_interval=30,
-                ping_timeout=10,
+                additional_headers=auth_headers,
+                # WebSocket subprotocol based on version
+                subprotocols=_SUBPROTOCOLS.get(version, ()),
+                **self._BASE_WS_KWARGS,
+                # OCPP frames are small JSON; deflate costs CPU for little saving unless opted in
+                compression=service_config.get("compression"),
+                **connect_kwargs,
             )
 
             # Create OCPP client using factory
             client = OCPPServiceFactory.create_service_client(
                 service_id, connection, version, manager=self
             )
-            self.services[service_id] = client
+            service = ServiceClient(
+                service_id,
+                client,
+                connection,
+                version,
+                connected=True,
+                authenticated=bool(auth_headers),
+            )
+            self.services[service_id] = service
 
-            # Start the client in a background task
+            # Start the client in a background task; it ends when the connection closes
             task = asyncio.create_task(client.start())
+            task.add_done_callback(service.mark_disconnected)
             self._connection_tasks[service_id] = task
+            # The first live connection starts the keepalive shared by all services
+            if self._keepalive_task is None:
+                self._keepalive_task = asyncio.create_task(self._keepalive_loop())
 
             _LOGGER.info(f"Connecting to OCPP {version} service {service_id} at {url}")
 
         except Exception:
             _LOGGER.exception(f"Failed to connect to OCPP service {service_id}")
 
+    async def _connect_with_retry(self, service_id: str, url: str, **kwargs: Any) -> Any:
+        """Open the service WebSocket, retrying transient failures with backoff."""
+        attempt = 0
+        while True:
+            try:
+                return await websockets.connect(url, **kwargs)
+            except _RETRYABLE_CONNECT_ERRORS as e:
+                # Auth rejections and other 4xx responses will not succeed on a retry
+                rejected = isinstance(e, websockets.InvalidStatus) and e.response.status_code < 500
+                if rejected or attempt + 1 >= _CONNECT_ATTEMPTS:
+                    raise
+                delay = min(_BACKOFF_CAP, _BACKOFF_BASE * 2**attempt)
+                # Jitter spreads out reconnects from several services failing at once
+                delay += random.uniform(0, delay / 2)
+                _LOGGER.warning(
+                    f"Connecting to OCPP service {service_id} failed, retrying in {delay:.2f}s"
+                )
+                await asyncio.sleep(delay)
+                attempt += 1
+
+    async def _keepalive_loop(self) -> None:
+        """Ping all service connections periodically from a single task."""
+        while True:
+            await asyncio.sleep(_KEEPALIVE_INTERVAL)
+            await self._ping_services()
+
+    async def _ping_services(self) -> None:
+        """Ping every service connection once, closing those that miss the pong."""
+        await asyncio.gather(
+            *(
+                self._ping_service(service_id, client.connection)
+                for service_id, client in list(self.services.items())
+                if client.connection is not None
+            ),
+            return_exceptions=True,
+        )
+
+    async def _ping_service(self, service_id: str, connection: Any) -> None:
+        """Ping one service connection and close it if no pong arrives in time."""
+        try:
+            pong_waiter = await connection.ping()
+            await asyncio.wait_for(pong_waiter, _KEEPALIVE_TIMEOUT)
+        except TimeoutError:
+            _LOGGER.warning(f"OCPP service {service_id} did not answer keepalive ping, closing")
+            await connection.close()
+
     async def disconnect_service(self, service_id: str) -> None:
         """Disconnect from a specific OCPP service."""
-        if service_id in self.services:
-            client = self.services[service_id]
-
-            # Cancel connection task
-            if service_id in self._connection_tasks:
-                self._connection_tasks[service_id].cancel()
-                del self._connection_tasks[service_id]
-
-            # Close WebSocket connection
-            if hasattr(client, "_connection"):
-                await client._connection.close()
-
-            del self.services[service_id]
-            _LOGGER.info(f"Disconnected from OCPP service {service_id}")
+        client = self.services.pop(service_id, None)
+        if client is None:
+            return
+        client.mark_disconnected()
+
+        pending: list[Any] = []
+        # Cancel connection task
+        task = self._connection_tasks.pop(service_id, None)
+        if task is not None:
+            task.cancel()
+            pending.append(task)
+        # Close WebSocket connection
+        if client.connection is not None:
+            pending.append(client.connection.close())
+        # Await the cancelled task so it is not left pending, closing the socket meanwhile
+        await asyncio.gather(*pending, return_exceptions=True)
+        _LOGGER.info(f"Disconnected from OCPP service {service_id}")
 
     async def request_control_from_service(
         self, service_id: str, action: str, params: dict[str, Any]
@@ -123,75 +300,122 @@ class OCPPServiceManager:
         # Treat OCPP services as special backend clients
         success = await self.backend_manager.request_control(f"ocpp_service_{service_id}")
 
-        if success and hasattr(self.backend_manager, "_app"):
-            # Forward the request to the charge point
-            cp = self.backend_manager._app.get("charge_point")
-            if cp:
-                try:
-                    if action == "RemoteStartTransaction":
-                        result = await cp.send_remote_start_transaction(
-                            connector_id=params.get("connector_id", 1), id_tag=params.get("id_tag")
-                        )
-                        return bool(result)
-                    if action == "RemoteStopTransaction":
-                        result = await cp.send_remote_stop_transaction(
-                            transaction_id=params.get("transaction_id")
-                        )
-                        return bool(result)
-                except Exception:
-                    _LOGGER.exception(f"Error forwarding {action} from service {service_id}")
+        # Forward the request to the charge point
+        cp = self._cp
+        remote_action = _REMOTE_ACTIONS.get(action)
+        if success and cp and remote_action:
+            method_name, param_defaults = remote_action
+            try:
+                result = await getattr(cp, method_name)(
+                    **{name: params.get(name, default) for name, default in param_defaults}
+                )
+                return bool(result)
+            except _FORWARD_ERRORS:
+                _LOGGER.exception(f"Error forwarding {action} from service {service_id}")
 
         return False
 
     def broadcast_event_to_services(self, event: dict[str, Any]) -> None:
         """Broadcast charger events to all connected OCPP services."""
-        for client in self.services.values():
-            if hasattr(client, "connected") and client.connected:
-                task = asyncio.create_task(self._send_event_to_service(client, event))
-                # Store reference to prevent task being garbage collected
-                self._background_tasks.add(task)
-                task.add_done_callback(self._background_tasks.discard)
-
-    async def _send_event_to_service(self, client: Any, event: dict[str, Any]) -> None:
+        clients = [client for client in self.services.values() if client.connected]
+        if not clients:
+            return
+        if event.get("type") == "meter":
+            self._coalesce_meter_event(event)
+            return
+        if self._pending_meter:
+            # Buffered meter readings predate this event, so send them first in the same task
+            events = [*self._take_pending_meter(), event]
+            self._track_task(asyncio.create_task(self._send_events_in_order(clients, events)))
+            return
+        # One task per event fans out to every client, instead of one task per client
+        self._track_task(asyncio.create_task(self._send_event_to_clients(clients, event)))
+
+    def _track_task(self, task: asyncio.Task[Any]) -> None:
+        """Keep a reference to a background task until it finishes."""
+        # Store reference to prevent task being garbage collected
+        self._background_tasks.add(task)
+        task.add_done_callback(self._background_tasks.discard)
+
+    def _coalesce_meter_event(self, event: dict[str, Any]) -> None:
+        """Merge a meter event into the pending batch and schedule its flush."""
+        # Only events that agree on every other field are merged, so none of them is lost
+        key = tuple((name, value) for name, value in sorted(event.items()) if name != "values")
+        pending = self._pending_meter.get(key)
+        if pending is None:
+            self._pending_meter[key] = {**event, "values": list(event.get("values") or ())}
+        else:
+            pending["values"].extend(event.get("values") or ())
+        if self._meter_flush_task is None:
+            self._meter_flush_task = asyncio.create_task(self._flush_meter_events())
+            self._track_task(self._meter_flush_task)
+
+    def _take_pending_meter(self) -> list[dict[str, Any]]:
+        """Remove and return the pending meter events, cancelling their scheduled flush."""
+        if self._meter_flush_task is not None:
+            self._meter_flush_task.cancel()
+            self._meter_flush_task = None
+        events = list(self._pending_meter.values())
+        self._pending_meter.clear()
+        return events
+
+    async def _flush_meter_events(self) -> None:
+        """Broadcast the meter events collected during the coalescing window."""
+        await asyncio.sleep(_METER_COALESCE_WINDOW)
+        # Detach first so taking the batch does not cancel this task
+        self._meter_flush_task = None
+        events = self._take_pending_meter()
+        clients = [client for client in self.services.values() if client.connected]
+        await self._send_events_in_order(clients, events)
+
+    async def _send_events_in_order(
+        self, clients: list[ServiceClient], events: list[dict[str, Any]]
+    ) -> None:
+        """Send several events to the services one after another."""
+        for event in events:
+            await self._send_event_to_clients(clients, event)
+
+    async def _send_event_to_clients(
+        self, clients: list[ServiceClient], event: dict[str, Any]
+    ) -> None:
+        """Send an event to several OCPP services concurrently."""
+        await asyncio.gather(
+            *(self._send_event_to_service(client, event) for client in clients),
+            return_exceptions=True,
+        )
+
+    async def _send_event_to_service(self, client: ServiceClient, event: dict[str, Any]) -> None:
         """Send a specific event to an OCPP service."""
+        handler = _EVENT_HANDLERS.get(event.get("type", ""))
+        if handler is None:
+            return
         try:
-            event_type = event.get("type")
-
-            # The ChargePoint implementations handle the actual message sending
-            # We just need to forward the events to the service clients
-            if event_type == "status":
-                # Services receive status updates passively
-                pass
-            elif event_type == "meter":
-                # Services receive meter values passively
-                pass
-            elif event_type == "transaction_started" or event_type == "transaction_stopped":
-                # Services receive transaction events passively
-                pass
-            elif event_type == "heartbeat":
-                # Services receive heartbeat events passively
-                pass
-            elif event_type == "boot":
-                # Services receive boot notifications passively
-                pass
-
+            await handler(client, event)
         except Exception:
-            _LOGGER.exception(
-                f"Error sending event to service {getattr(client, 'service_id', 'unknown')}"
-            )
+            _LOGGER.exception(f"Error sending event to service {client.service_id}")
 
     async def stop_all_services(self) -> None:
         """Stop all OCPP service connections."""
-        for service_id in list(self.services.keys()):
-            await self.disconnect_service(service_id)
+        # Stop the keepalive and any pending meter flush before closing the connections
+        tasks = [task for task in (self._keepalive_task, self._meter_flush_task) if task]
+        self._keepalive_task = self._meter_flush_task = None
+        self._pending_meter.clear()
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        # Close concurrently; snapshot the ids because disconnect_service mutates self.services
+        await asyncio.gather(
+            *(self.disconnect_service(service_id) for service_id in list(self.services)),
+            return_exceptions=True,
+        )
 
     def get_service_status(self) -> dict[str, dict[str, Any]]:
         """Get status of all OCPP services."""
-        status = {}
-        for service_id, client in self.services.items():
-            status[service_id] = {
-                "connected": getattr(client, "connected", False),
-                "authenticated": getattr(client, "authenticated", False),
-                "version": getattr(client, "ocpp_version", "unknown"),
+        return {
+            service_id: {
+                "connected": client.connected,
+                "authenticated": client.authenticated,
+                "version": client.ocpp_version,
             }
-        return status
+            for service_id, client in self.services.items()
+        }
@@ -1,5 +1,6 @@
 import asyncio
 import datetime
+import json
 import logging
 from typing import Any
 
@@ -31,8 +32,6 @@ class BackendManager:
         self._lock_timer: asyncio.Task[None] | None = None
         # Rate-limiting timestamps per backend
         self._last_request_time: dict[str, datetime.datetime] = {}
-        # Reference to app for charge point access
-        self._app = None
 
     def subscribe(self, backend_id: str, ws: web.WebSocketResponse) -> None:
         """Register a new backend subscriber with its WebSocket connection."""
@@ -46,11 +45,20 @@ class BackendManager:
 
     async def broadcast_event(self, event: Any) -> None:
         """Forward charger event to all subscribers via WebSocket and OCPP services."""
-        # Broadcast to WebSocket subscribers
-        for ws in list(self.subscribers.values()):
+        # Broadcast to WebSocket subscribers; encode once rather than once per subscriber
+        subscribers = list(self.subscribers.values())
+        payload = ""
+        if subscribers:
+            try:
+                payload = json.dumps({"type": "event", **event})
+            except (TypeError, ValueError) as e:
+                # Skip only the WebSocket fan-out; OCPP services still get the event
+                _LOGGER.warning(f"Failed to encode event for backends: {e}")
+                subscribers = []
+        for ws in subscribers:
             # best-effort send; ignore failures
             try:
-                await ws.send_json({"type": "event", **event})
+                await ws.send_str(payload)
             except Exception as e:
                 _LOGGER.debug(f"Failed to send event to backend: {e}")
                 continue
@@ -147,10 +155,6 @@ class BackendManager:
         await asyncio.sleep(timeout)
         self.release_control()
 
-    def set_app_reference(self, app: Any) -> None:
-        """Set reference to the aiohttp app for charge point access."""
-        self._app = app
-
     def get_backend_status(self) -> dict[str, Any]:
         """Get status of all backends including OCPP services."""
         status: dict[str, Any] = {
@@ -1,7 +1,49 @@
-import datetime
+import functools
 import sqlite3
+import threading
+import time
+from collections.abc import Iterable
 from typing import Any
 
+_SESSION_COLUMNS = ("timestamp", "backend_id", "duration_s", "energy_kwh", "revenue")
+
+_SCHEMA_DDL = """
+CREATE TABLE IF NOT EXISTS sessions (
+    timestamp TEXT,
+    backend_id TEXT,
+    duration_s REAL,
+    energy_kwh REAL,
+    revenue REAL
+);
+CREATE INDEX IF NOT EXISTS idx_sessions_ts ON sessions (timestamp);
+"""
+
+_INSERT_SESSION_SQL = (
+    "INSERT INTO sessions (timestamp, backend_id, duration_s, energy_kwh, revenue) "
+    "VALUES (?, ?, ?, ?, ?)"
+)
+
+
+def _session_row_factory(_cursor: sqlite3.Cursor, row: tuple[Any, ...]) -> dict[str, Any]:
+    """Build a session dict directly from a result row."""
+    return dict(zip(_SESSION_COLUMNS, row, strict=True))
+
+
+@functools.lru_cache(maxsize=4)
+def _format_utc_seconds(seconds: int) -> str:
+    """Format whole UTC seconds as an ISO 8601 date-time (cached per second)."""
+    return time.strftime("%Y-%m-%dT%H:%M:%S", time.gmtime(seconds))
+
+
+def _utc_timestamp() -> str:
+    """Return the current UTC time as an ISO 8601 string with microseconds.
+
+    Equivalent to ``datetime.now(UTC).isoformat(timespec="microseconds")`` but avoids
+    building a datetime object for every logged session.
+    """
+    seconds, micros = divmod(time.time_ns() // 1000, 1_000_000)
+    return f"{_format_utc_seconds(seconds)}.{micros:06d}+00:00"
+
 
 class EventLogger:
     """
@@ -10,66 +52,58 @@ class EventLogger:
 
     def __init__(self, db_path: str = "usage_log.db"):
         self.db_path = db_path
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        cursor.execute(
-            """
-            CREATE TABLE IF NOT EXISTS sessions (
-                timestamp TEXT,
-                backend_id TEXT,
-                duration_s REAL,
-                energy_kwh REAL,
-                revenue REAL
-            )
-        """
-        )
-        conn.commit()
-        conn.close()
+        # Single long-lived connection so sqlite3's statement cache keeps the
+        # compiled INSERT/SELECT statements around between calls
+        self._conn = sqlite3.connect(self.db_path, check_same_thread=False, cached_statements=128)
+        self._lock = threading.Lock()
+        self._insert_stmt = _INSERT_SESSION_SQL
+        # Skip the DDL when the newest schema object already exists; older databases
+        # created before the timestamp index still get it added
+        if (
+            self._conn.execute(
+                "SELECT 1 FROM sqlite_master WHERE type='index' AND name='idx_sessions_ts'"
+            ).fetchone()
+            is None
+        ):
+            self._conn.executescript(_SCHEMA_DDL)
 
     def log_session(
         self, backend_id: str, duration_s: float, energy_kwh: float, revenue: float
     ) -> None:
         """Persist a session record into SQLite."""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        cursor.execute(
-            "INSERT INTO sessions (timestamp, backend_id, duration_s, energy_kwh, revenue) "
-            "VALUES (?, ?, ?, ?, ?)",
-            (
-                datetime.datetime.now(datetime.UTC).isoformat(),
-                backend_id,
-                duration_s,
-                energy_kwh,
-                revenue,
-            ),
-        )
-        conn.commit()
-        conn.close()
+        with self._lock, self._conn:
+            self._conn.execute(
+                self._insert_stmt,
+                (
+                    _utc_timestamp(),
+                    backend_id,
+                    duration_s,
+                    energy_kwh,
+                    revenue,
+                ),
+            )
+
+    def log_sessions_bulk(self, sessions: Iterable[tuple[str, float, float, float]]) -> None:
+        """Persist many (backend_id, duration_s, energy_kwh, revenue) records in one transaction."""
+        rows = ((_utc_timestamp(), *session) for session in sessions)
+        with self._lock, self._conn:
+            self._conn.executemany(self._insert_stmt, rows)
 
     def get_sessions(self) -> list[dict[str, Any]]:
         """Fetch all logged sessions as list of dicts."""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        cursor.execute(
-            "SELECT timestamp, backend_id, duration_s, energy_kwh, revenue "
-            "FROM sessions ORDER BY timestamp"
-        )
-        rows = cursor.fetchall()
-        conn.close()
-
-        sessions = []
-        for ts, backend, dur, energy, rev in rows:
-            sessions.append(
-                {
-                    "timestamp": ts,
-                    "backend_id": backend,
-                    "duration_s": dur,
-                    "energy_kwh": energy,
-                    "revenue": rev,
-                }
-            )
-        return sessions
+        with self._lock:
+            cursor = self._conn.cursor()
+            cursor.row_factory = _session_row_factory
+            return cursor.execute(
+                "SELECT timestamp, backend_id, duration_s, energy_kwh, revenue "
+                "FROM sessions ORDER BY timestamp"
+            ).fetchall()
 
     def export_db(self) -> str:
         """Return path to the SQLite database file."""
         return self.db_path
+
+    def close(self) -> None:
+        """Close the underlying SQLite connection."""
+        with self._lock:
+            self._conn.close()
@@ -33,12 +33,18 @@ async def charger_handler(request: web.Request) -> web.WebSocketResponse:
     )
     # store active charge point for proxying control requests
     request.app["charge_point"] = cp
+    request.app["ocpp_service_manager"].set_charge_point(cp)
     _LOGGER.info(f"Charger connected using OCPP {cp.ocpp_version}")
     try:
         await cp.start()
     except Exception:
         _LOGGER.exception("Charger handler error")
     finally:
+        # Stop forwarding control requests to this charger, unless a newer connection
+        # has already replaced it
+        if request.app.get("charge_point") is cp:
+            del request.app["charge_point"]
+            request.app["ocpp_service_manager"].set_charge_point(None)
         await ws.close(code=WSCloseCode.GOING_AWAY)
     return ws
 
@@ -147,7 +153,7 @@ async def backend_handler(request: web.Request) -> web.WebSocketResponse:
             if msg.type == web.WSMsgType.TEXT:
                 data = msg.json()
                 action = data.get("action")
-                cp = request.app.get("charge_point")
+                cp = request.app["cp_provider"]()
                 # Remote start request
                 if action == "RemoteStartTransaction" and cp:
                     allowed = await manager.request_control(backend_id)
@@ -191,9 +197,9 @@ async def init_app() -> web.Application:
     app["ha_bridge"] = ha
     app["event_logger"] = EventLogger(db_path=os.getenv("LOG_DB_PATH", "usage_log.db"))
     app["ocpp_service_manager"] = ocpp_service_manager
-
-    # Set app reference for backend manager
-    app["backend_manager"].set_app_reference(app)
+    # Handlers look up the active charge point through this callable so it can be
+    # supplied from elsewhere (e.g. by tests) without mutating the running app
+    app["cp_provider"] = lambda: app.get("charge_point")
 
     # Start OCPP service connections
     await ocpp_service_manager.start_services()
@@ -216,6 +222,8 @@ async def cleanup_app(app: web.Application) -> None:
     """Cleanup function to properly close OCPP service connections."""
     if "ocpp_service_manager" in app:
         await app["ocpp_service_manager"].stop_all_services()
+    if "event_logger" in app:
+        app["event_logger"].close()
 
 
 def main() -> None:
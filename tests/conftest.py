@@ -4,15 +4,21 @@ Pytest configuration and shared fixtures.
 
 import os
 import sqlite3
+import sys
 import tempfile
-from unittest.mock import AsyncMock, Mock
+from unittest.mock import AsyncMock, Mock, patch
 
+import orjson
 import pytest
+import pytest_asyncio
+from aiohttp import ClientSession, TCPConnector
+from aiohttp.test_utils import TestServer
 
 from src.ocpp_proxy.backend_manager import BackendManager
 from src.ocpp_proxy.config import Config
 from src.ocpp_proxy.ha_bridge import HABridge
 from src.ocpp_proxy.logger import EventLogger
+from src.ocpp_proxy.main import cleanup_app, init_app
 
 
 @pytest.fixture
@@ -27,7 +33,7 @@ def temp_db():
 
 
 @pytest.fixture
-def temp_config_file():
+def temp_config_file(tmp_path):
     """Create a temporary configuration file."""
     config_data = {
         "allow_shared_charging": True,
@@ -36,14 +42,11 @@ def temp_config_file():
         "ocpp_services": [],
     }
 
-    with tempfile.NamedTemporaryFile(mode="w", suffix=".yaml", delete=False) as f:
-        import yaml
+    import yaml
 
-        yaml.dump(config_data, f)
-        config_path = f.name
-
-    yield config_path
-    os.unlink(config_path)
+    config_path = tmp_path / "config.yaml"
+    config_path.write_text(yaml.dump(config_data))
+    return str(config_path)
 
 
 @pytest.fixture
@@ -100,7 +103,9 @@ def mock_backend_manager():
 @pytest.fixture
 def event_logger(temp_db):
     """Create a real EventLogger instance for testing."""
-    return EventLogger(temp_db)
+    logger = EventLogger(temp_db)
+    yield logger
+    logger.close()
 
 
 @pytest.fixture
@@ -167,18 +172,24 @@ def mock_websocket():
     return ws
 
 
+_OCPP_CALL_NAMES = (
+    "call_remote_start_transaction",
+    "call_remote_stop_transaction",
+    "call_boot_notification",
+    "call_heartbeat",
+    "call_status_notification",
+    "call_meter_values",
+    "call_start_transaction",
+    "call_stop_transaction",
+)
+
+
 @pytest.fixture
 def mock_charge_point():
     """Create a mock charge point."""
     cp = Mock()
-    cp.call_remote_start_transaction = AsyncMock()
-    cp.call_remote_stop_transaction = AsyncMock()
-    cp.call_boot_notification = AsyncMock()
-    cp.call_heartbeat = AsyncMock()
-    cp.call_status_notification = AsyncMock()
-    cp.call_meter_values = AsyncMock()
-    cp.call_start_transaction = AsyncMock()
-    cp.call_stop_transaction = AsyncMock()
+    for name in _OCPP_CALL_NAMES:
+        setattr(cp, name, AsyncMock())
     return cp
 
 
@@ -223,16 +234,98 @@ def pytest_configure(config):
     config.addinivalue_line("markers", "e2e: marks tests as end-to-end tests")
     config.addinivalue_line("markers", "slow: marks tests as slow running")
 
+    # Run async tests on uvloop; it is not available on Windows
+    if sys.platform != "win32":
+        import asyncio
+
+        import uvloop
+
+        asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
+
+
+class _NullOCPPServiceManager:
+    """In-process stand-in for OCPPServiceManager that never opens connections."""
+
+    def __init__(self, config=None):
+        self.config = config
+        self.services = {}
+
+    async def start_services(self):
+        pass
+
+    async def stop_all_services(self):
+        pass
+
+    def set_charge_point(self, cp):
+        pass
+
+    def broadcast_event_to_services(self, event):
+        pass
+
+    def get_service_status(self):
+        return {}
 
-# Async test configuration
+
+@pytest.fixture(scope="session", autouse=True)
+def null_ocpp_service_manager(session_mocker):
+    """Build every test application with the null OCPP service manager."""
+    return session_mocker.patch("src.ocpp_proxy.main.OCPPServiceManager", _NullOCPPServiceManager)
+
+
+class _ChargePointSlot:
+    """Holds the charge point that the session application hands to its handlers."""
+
+    def __init__(self):
+        self.value = None
+
+    def get(self):
+        return self.value
+
+
+# Application server fixtures shared by the integration tests
 @pytest.fixture(scope="session")
-def event_loop():
-    """Create an instance of the default event loop for the test session."""
-    import asyncio
+def cp_slot():
+    """Charge point seen by the session application; tests assign ``cp_slot.value``."""
+    return _ChargePointSlot()
+
+
+@pytest_asyncio.fixture(scope="session", loop_scope="session")
+async def app_once(tmp_path_factory, cp_slot):
+    """Initialize the proxy application once for the whole test session."""
+    env = {
+        "HA_URL": "",
+        "HA_TOKEN": "",
+        "LOG_DB_PATH": str(tmp_path_factory.mktemp("app") / "usage_log.db"),
+    }
+    with patch.dict(os.environ, env):
+        app = await init_app()
+    # Serve the charge point from the slot so tests never mutate the running app
+    app["cp_provider"] = cp_slot.get
+
+    yield app
+    await cleanup_app(app)
+
 
-    loop = asyncio.get_event_loop_policy().new_event_loop()
-    yield loop
-    loop.close()
+@pytest_asyncio.fixture(scope="session", loop_scope="session")
+async def app_server(app_once):
+    """Serve the session application over a real socket."""
+    server = TestServer(app_once)
+    await server.start_server()
+    yield server
+    await server.close()
+
+
+@pytest_asyncio.fixture(scope="session", loop_scope="session")
+async def http_session():
+    """Create one client session so requests reuse pooled keep-alive connections."""
+    # No pool limit and a long keep-alive so idle sockets survive between tests
+    connector = TCPConnector(limit=0, force_close=False, keepalive_timeout=60)
+    async with ClientSession(
+        connector=connector,
+        connector_owner=True,
+        json_serialize=lambda obj: orjson.dumps(obj).decode(),
+    ) as session:
+        yield session
 
 
 # Database fixtures for testing
@@ -255,4 +348,5 @@ def populated_db(temp_db, sample_sessions_data):
             session["backend_id"], session["duration_s"], session["energy_kwh"], session["revenue"]
         )
 
-    return logger
+    yield logger
+    logger.close()
@@ -56,7 +56,6 @@ class TestBackendManager:
         assert backend_manager._lock_owner is None
         assert backend_manager._lock_timer is None
         assert backend_manager._last_request_time == {}
-        assert backend_manager._app is None
 
     @pytest.mark.unit
     def test_subscribe_and_unsubscribe(self, backend_manager):
@@ -85,51 +84,69 @@ class TestBackendManager:
         assert backend_manager._lock_owner is None
 
     @pytest.mark.unit
-    def test_broadcast_event_websocket_only(self, backend_manager):
+    @pytest.mark.asyncio
+    async def test_broadcast_event_websocket_only(self, backend_manager):
         """Test broadcasting events to WebSocket subscribers only."""
         mock_ws1 = Mock(spec=web.WebSocketResponse)
         mock_ws2 = Mock(spec=web.WebSocketResponse)
-        mock_ws1.send_json = Mock()
-        mock_ws2.send_json = Mock()
+        mock_ws1.send_str = AsyncMock()
+        mock_ws2.send_str = AsyncMock()
 
         backend_manager.subscribe("backend1", mock_ws1)
         backend_manager.subscribe("backend2", mock_ws2)
 
         event = {"type": "test_event", "data": "test_data"}
-        backend_manager.broadcast_event(event)
+        await backend_manager.broadcast_event(event)
 
-        mock_ws1.send_json.assert_called_once_with(
-            {"type": "event", "type": "test_event", "data": "test_data"}
-        )
-        mock_ws2.send_json.assert_called_once_with(
-            {"type": "event", "type": "test_event", "data": "test_data"}
-        )
+        # The event's own type overrides the envelope's "event" type
+        expected = '{"type": "test_event", "data": "test_data"}'
+        mock_ws1.send_str.assert_called_once_with(expected)
+        mock_ws2.send_str.assert_called_once_with(expected)
 
     @pytest.mark.unit
-    def test_broadcast_event_with_ocpp_services(self, backend_manager):
+    @pytest.mark.asyncio
+    async def test_broadcast_event_with_ocpp_services(self, backend_manager):
         """Test broadcasting events to both WebSocket and OCPP services."""
         mock_ws = Mock(spec=web.WebSocketResponse)
-        mock_ws.send_json = Mock()
+        mock_ws.send_str = AsyncMock()
         backend_manager.subscribe("backend1", mock_ws)
 
         event = {"type": "test_event", "data": "test_data"}
-        backend_manager.broadcast_event(event)
+        await backend_manager.broadcast_event(event)
 
-        mock_ws.send_json.assert_called_once()
+        mock_ws.send_str.assert_called_once()
         backend_manager.ocpp_service_manager.broadcast_event_to_services.assert_called_once_with(
             event
         )
 
     @pytest.mark.unit
-    def test_broadcast_event_websocket_failure(self, backend_manager):
+    @pytest.mark.asyncio
+    async def test_broadcast_event_websocket_failure(self, backend_manager):
         """Test broadcasting events when WebSocket fails."""
         mock_ws = Mock(spec=web.WebSocketResponse)
-        mock_ws.send_json = Mock(side_effect=Exception("WebSocket error"))
+        mock_ws.send_str = AsyncMock(side_effect=Exception("WebSocket error"))
         backend_manager.subscribe("backend1", mock_ws)
 
         event = {"type": "test_event"}
         # Should not raise exception
-        backend_manager.broadcast_event(event)
+        await backend_manager.broadcast_event(event)
+
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    async def test_broadcast_event_unencodable(self, backend_manager):
+        """Test an event that cannot be encoded still reaches the OCPP services."""
+        mock_ws = Mock(spec=web.WebSocketResponse)
+        mock_ws.send_str = AsyncMock()
+        backend_manager.subscribe("backend1", mock_ws)
+
+        event = {"type": "test_event", "data": object()}
+        # Should not raise exception
+        await backend_manager.broadcast_event(event)
+
+        mock_ws.send_str.assert_not_called()
+        backend_manager.ocpp_service_manager.broadcast_event_to_services.assert_called_once_with(
+            event
+        )
 
     @pytest.mark.unit
     @pytest.mark.asyncio
@@ -310,13 +327,6 @@ class TestBackendManager:
         assert old_timer.cancelled()
         assert backend_manager._lock_timer is not None
 
-    @pytest.mark.unit
-    def test_set_app_reference(self, backend_manager):
-        """Test setting app reference."""
-        mock_app = Mock()
-        backend_manager.set_app_reference(mock_app)
-        assert backend_manager._app == mock_app
-
     @pytest.mark.unit
     def test_get_backend_status(self, backend_manager):
         """Test getting backend status."""
@@ -424,15 +434,16 @@ class TestBackendManager:
         assert backend_manager._lock_owner.startswith("backend")
 
     @pytest.mark.unit
-    def test_broadcast_event_no_ocpp_manager(self, mock_config):
+    @pytest.mark.asyncio
+    async def test_broadcast_event_no_ocpp_manager(self, mock_config):
         """Test broadcasting events without OCPP service manager."""
         backend_manager = BackendManager(mock_config)
         mock_ws = Mock(spec=web.WebSocketResponse)
-        mock_ws.send_json = Mock()
+        mock_ws.send_str = AsyncMock()
         backend_manager.subscribe("backend1", mock_ws)
 
         event = {"type": "test_event"}
-        backend_manager.broadcast_event(event)
+        await backend_manager.broadcast_event(event)
 
-        mock_ws.send_json.assert_called_once()
+        mock_ws.send_str.assert_called_once()
         # Should not raise exception even without OCPP manager
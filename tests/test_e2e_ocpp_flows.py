@@ -36,12 +36,7 @@ class TestOCPPFlowsE2E(AioHTTPTestCase):
     async def get_application(self):
         """Create application for testing."""
         with patch.dict(os.environ, {"HA_URL": "", "HA_TOKEN": ""}):
-            with patch("src.ocpp_proxy.main.OCPPServiceManager") as mock_ocpp_manager:
-                mock_ocpp_manager.return_value.start_services = AsyncMock()
-                mock_ocpp_manager.return_value.get_service_status = Mock(return_value={})
-                mock_ocpp_manager.return_value.broadcast_event_to_services = Mock()
-
-                return await init_app()
+            return await init_app()
 
     @pytest.mark.e2e
     async def test_charger_boot_sequence(self):
@@ -49,7 +44,10 @@ class TestOCPPFlowsE2E(AioHTTPTestCase):
         # Mock ChargePoint to capture boot sequence
         with patch("src.ocpp_proxy.main.ChargePointFactory.create_charge_point") as mock_cp_factory:
             mock_cp = Mock()
-            mock_cp.start = AsyncMock()
+            # Keep the charge point running until the checks are done; the handler
+            # forgets it once start() returns
+            disconnect = asyncio.Event()
+            mock_cp.start = AsyncMock(side_effect=disconnect.wait)
             mock_cp_factory.return_value = mock_cp
 
             # Connect charger
@@ -68,6 +66,7 @@ class TestOCPPFlowsE2E(AioHTTPTestCase):
 
                 # Verify charge point was stored in app
                 assert self.app["charge_point"] == mock_cp
+                disconnect.set()
 
     @pytest.mark.e2e
     async def test_backend_subscription_and_control(self):
@@ -538,8 +537,8 @@ class TestOCPPServiceFlows:
         # Mock websockets.connect to capture auth headers
         auth_headers = []
 
-        async def mock_connect(url, extra_headers=None, **kwargs):
-            auth_headers.append(extra_headers or {})
+        async def mock_connect(url, additional_headers=None, **kwargs):
+            auth_headers.append(additional_headers or {})
             # Return a mock connection
             return Mock()
 
@@ -1,7 +1,7 @@
+import gc
 import os
 import sqlite3
-import tempfile
-from datetime import datetime
+from datetime import UTC, datetime
 from unittest.mock import Mock, patch
 
 import pytest
@@ -9,58 +9,94 @@ import pytest
 from src.ocpp_proxy.logger import EventLogger
 
 
+def _count_sqlite_connections():
+    """Count live sqlite3.Connection objects tracked by the garbage collector."""
+    return sum(1 for obj in gc.get_objects() if isinstance(obj, sqlite3.Connection))
+
+
+@pytest.fixture(scope="session")
+def schema_snapshot():
+    """Introspect the EventLogger schema once per test session."""
+    event_logger = EventLogger(":memory:")
+    conn = event_logger._conn
+    snapshot = {
+        "tables": {
+            row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type='table'")
+        },
+        "columns": [(row[1], row[2]) for row in conn.execute("PRAGMA table_info(sessions)")],
+        "indexes": {
+            row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type='index'")
+        },
+    }
+    event_logger.close()
+    return snapshot
+
+
+@pytest.fixture(scope="class")
+def shared_db_path(tmp_path_factory):
+    """Return a database path shared by all tests in the class."""
+    return str(tmp_path_factory.mktemp("event_logger") / "usage_log.db")
+
+
+@pytest.fixture(scope="class")
+def shared_reader(shared_db_path):
+    """Open one read-only verification connection for the whole class."""
+    EventLogger(shared_db_path).close()  # create the schema
+    conn = sqlite3.connect(f"file:{shared_db_path}?mode=ro", uri=True)
+    yield conn
+    conn.close()
+
+
 class TestEventLogger:
     """Unit tests for EventLogger class."""
 
     @pytest.fixture
-    def temp_db_path(self):
-        """Create a temporary database file for testing."""
-        with tempfile.NamedTemporaryFile(suffix=".db", delete=False) as f:
-            db_path = f.name
-        yield db_path
-        # Cleanup
-        if os.path.exists(db_path):
-            os.unlink(db_path)
+    def temp_db_path(self, tmp_path):
+        """Return a database path inside the per-test temporary directory."""
+        return str(tmp_path / "usage_log.db")
 
     @pytest.fixture
     def event_logger(self, temp_db_path):
-        """Create an EventLogger instance for testing."""
-        return EventLogger(temp_db_path)
+        """Create an EventLogger instance for testing, closing its connection afterwards."""
+        logger = EventLogger(temp_db_path)
+        yield logger
+        logger.close()
+
+    @pytest.fixture
+    def shared_logger(self, shared_db_path, shared_reader):
+        """Create an EventLogger on the shared database, emptied after each test."""
+        logger = EventLogger(shared_db_path)
+        yield logger
+        with logger._conn:
+            logger._conn.execute("DELETE FROM sessions")
+        logger.close()
 
     @pytest.mark.unit
-    def test_initialization_default_path(self):
+    def test_initialization_default_path(self, tmp_path, monkeypatch):
         """Test EventLogger initialization with default path."""
+        # Relative default path lands in the temporary directory
+        monkeypatch.chdir(tmp_path)
+
         logger = EventLogger()
+        logger.close()
         assert logger.db_path == "usage_log.db"
-
-        # Cleanup
-        if os.path.exists("usage_log.db"):
-            os.unlink("usage_log.db")
+        assert (tmp_path / "usage_log.db").exists()
 
     @pytest.mark.unit
     def test_initialization_custom_path(self, temp_db_path):
         """Test EventLogger initialization with custom path."""
         logger = EventLogger(temp_db_path)
+        logger.close()
         assert logger.db_path == temp_db_path
 
     @pytest.mark.unit
-    def test_database_schema_creation(self, event_logger):
+    def test_database_schema_creation(self, schema_snapshot):
         """Test that database schema is created correctly."""
-        # Connect to the database and check schema
-        conn = sqlite3.connect(event_logger.db_path)
-        cursor = conn.cursor()
-
         # Check if sessions table exists
-        cursor.execute("SELECT name FROM sqlite_master WHERE type='table' AND name='sessions';")
-        result = cursor.fetchone()
-        assert result is not None
-        assert result[0] == "sessions"
+        assert "sessions" in schema_snapshot["tables"]
 
         # Check table schema
-        cursor.execute("PRAGMA table_info(sessions);")
-        columns = cursor.fetchall()
-
-        expected_columns = [
+        assert schema_snapshot["columns"] == [
             ("timestamp", "TEXT"),
             ("backend_id", "TEXT"),
             ("duration_s", "REAL"),
@@ -68,42 +104,48 @@ class TestEventLogger:
             ("revenue", "REAL"),
         ]
 
-        for i, (expected_name, expected_type) in enumerate(expected_columns):
-            assert columns[i][1] == expected_name
-            assert columns[i][2] == expected_type
-
-        conn.close()
+        # Check the timestamp index used by get_sessions ordering
+        assert "idx_sessions_ts" in schema_snapshot["indexes"]
 
     @pytest.mark.unit
-    def test_log_session_basic(self, event_logger):
-        """Test logging a basic session."""
-        event_logger.log_session(
-            backend_id="test_backend", duration_s=3600.0, energy_kwh=25.5, revenue=5.10
+    @pytest.mark.parametrize(
+        ("backend_id", "duration_s", "energy_kwh", "revenue"),
+        [
+            ("test_backend", 3600.0, 25.5, 5.10),
+            ("zero_backend", 0.0, 0.0, 0.0),
+            # Negative values should be allowed
+            ("negative_backend", -100.0, -5.0, -1.0),
+            ("backend_with_special_chars!@#$%^&*()_+-=[]{}|;:,.<>?", 3600.0, 25.0, 5.0),
+            ("backend_with_unicode_éñ中文🚗⚡", 3600.0, 25.0, 5.0),
+            ("precision_backend", 3600.123456789, 25.987654321, 5.12345678901234567890),
+        ],
+        ids=["basic", "zero", "negative", "special_chars", "unicode", "float_precision"],
+    )
+    def test_log_session(
+        self, shared_logger, shared_reader, backend_id, duration_s, energy_kwh, revenue
+    ):
+        """Test logging a single session and reading it back."""
+        shared_logger.log_session(
+            backend_id=backend_id, duration_s=duration_s, energy_kwh=energy_kwh, revenue=revenue
         )
 
         # Verify the session was logged
-        conn = sqlite3.connect(event_logger.db_path)
-        cursor = conn.cursor()
-        cursor.execute("SELECT * FROM sessions")
-        rows = cursor.fetchall()
+        rows = shared_reader.execute("SELECT * FROM sessions").fetchall()
 
         assert len(rows) == 1
         row = rows[0]
 
         # Check timestamp is recent (within last minute)
         timestamp = datetime.fromisoformat(row[0])
-        now = datetime.utcnow()
-        assert (now - timestamp).total_seconds() < 60
-
-        assert row[1] == "test_backend"
-        assert row[2] == 3600.0
-        assert row[3] == 25.5
-        assert row[4] == 5.10
+        assert (datetime.now(UTC) - timestamp).total_seconds() < 60
 
-        conn.close()
+        assert row[1] == backend_id
+        assert row[2] == pytest.approx(duration_s, abs=1e-6)
+        assert row[3] == pytest.approx(energy_kwh, abs=1e-6)
+        assert row[4] == pytest.approx(revenue, abs=1e-6)
 
     @pytest.mark.unit
-    def test_log_multiple_sessions(self, event_logger):
+    def test_log_multiple_sessions(self, shared_logger, shared_reader):
         """Test logging multiple sessions."""
         sessions = [
             ("backend1", 1800.0, 12.5, 2.50),
@@ -112,11 +154,10 @@ class TestEventLogger:
         ]
 
         for backend_id, duration, energy, revenue in sessions:
-            event_logger.log_session(backend_id, duration, energy, revenue)
+            shared_logger.log_session(backend_id, duration, energy, revenue)
 
         # Verify all sessions were logged
-        conn = sqlite3.connect(event_logger.db_path)
-        cursor = conn.cursor()
+        cursor = shared_reader.cursor()
         cursor.execute(
             "SELECT backend_id, duration_s, energy_kwh, revenue FROM sessions ORDER BY backend_id"
         )
@@ -129,91 +170,19 @@ class TestEventLogger:
             assert rows[i][2] == energy
             assert rows[i][3] == revenue
 
-        conn.close()
-
     @pytest.mark.unit
-    def test_log_session_with_zero_values(self, event_logger):
-        """Test logging session with zero values."""
-        event_logger.log_session(
-            backend_id="zero_backend", duration_s=0.0, energy_kwh=0.0, revenue=0.0
+    def test_log_sessions_bulk(self, event_logger):
+        """Test logging several sessions in one call."""
+        event_logger.log_sessions_bulk(
+            [("backend1", 1800.0, 12.5, 2.50), ("backend2", 3600.0, 25.0, 5.00)]
         )
 
-        # Verify the session was logged
-        conn = sqlite3.connect(event_logger.db_path)
-        cursor = conn.cursor()
-        cursor.execute("SELECT * FROM sessions")
-        rows = cursor.fetchall()
-
-        assert len(rows) == 1
-        row = rows[0]
-        assert row[1] == "zero_backend"
-        assert row[2] == 0.0
-        assert row[3] == 0.0
-        assert row[4] == 0.0
-
-        conn.close()
-
-    @pytest.mark.unit
-    def test_log_session_with_negative_values(self, event_logger):
-        """Test logging session with negative values."""
-        event_logger.log_session(
-            backend_id="negative_backend", duration_s=-100.0, energy_kwh=-5.0, revenue=-1.0
-        )
-
-        # Verify the session was logged (negative values should be allowed)
-        conn = sqlite3.connect(event_logger.db_path)
-        cursor = conn.cursor()
-        cursor.execute("SELECT * FROM sessions")
-        rows = cursor.fetchall()
-
-        assert len(rows) == 1
-        row = rows[0]
-        assert row[1] == "negative_backend"
-        assert row[2] == -100.0
-        assert row[3] == -5.0
-        assert row[4] == -1.0
-
-        conn.close()
-
-    @pytest.mark.unit
-    def test_log_session_with_special_characters(self, event_logger):
-        """Test logging session with special characters in backend_id."""
-        backend_id = "backend_with_special_chars!@#$%^&*()_+-=[]{}|;:,.<>?"
-
-        event_logger.log_session(
-            backend_id=backend_id, duration_s=3600.0, energy_kwh=25.0, revenue=5.0
-        )
-
-        # Verify the session was logged
-        conn = sqlite3.connect(event_logger.db_path)
-        cursor = conn.cursor()
-        cursor.execute("SELECT backend_id FROM sessions")
-        rows = cursor.fetchall()
-
-        assert len(rows) == 1
-        assert rows[0][0] == backend_id
-
-        conn.close()
-
-    @pytest.mark.unit
-    def test_log_session_with_unicode_characters(self, event_logger):
-        """Test logging session with unicode characters."""
-        backend_id = "backend_with_unicode_éñ中文🚗⚡"
-
-        event_logger.log_session(
-            backend_id=backend_id, duration_s=3600.0, energy_kwh=25.0, revenue=5.0
-        )
-
-        # Verify the session was logged
-        conn = sqlite3.connect(event_logger.db_path)
-        cursor = conn.cursor()
-        cursor.execute("SELECT backend_id FROM sessions")
-        rows = cursor.fetchall()
-
-        assert len(rows) == 1
-        assert rows[0][0] == backend_id
-
-        conn.close()
+        sessions = event_logger.get_sessions()
+        assert [session["backend_id"] for session in sessions] == ["backend1", "backend2"]
+        assert sessions[1]["duration_s"] == 3600.0
+        assert sessions[1]["energy_kwh"] == 25.0
+        assert sessions[1]["revenue"] == 5.00
+        assert all(datetime.fromisoformat(session["timestamp"]) for session in sessions)
 
     @pytest.mark.unit
     def test_get_sessions_empty(self, event_logger):
@@ -264,15 +233,19 @@ class TestEventLogger:
         assert "backend3" in backend_ids
 
     @pytest.mark.unit
-    def test_get_sessions_ordering(self, event_logger):
+    @patch("src.ocpp_proxy.logger._utc_timestamp")
+    def test_get_sessions_ordering(self, mock_timestamp, event_logger):
         """Test that sessions are returned in timestamp order."""
-        # Log sessions with slight delays to ensure different timestamps
-        import time
+        # Inject increasing timestamps instead of sleeping between inserts
+        mock_timestamp.side_effect = [
+            "2023-01-01T00:00:02.000000+00:00",
+            "2023-01-01T00:00:01.000000+00:00",
+            "2023-01-01T00:00:03.000000+00:00",
+        ]
 
-        event_logger.log_session("first_backend", 1800.0, 12.5, 2.50)
-        time.sleep(0.01)
+        # Insert out of chronological order so the ORDER BY does the work
         event_logger.log_session("second_backend", 3600.0, 25.0, 5.00)
-        time.sleep(0.01)
+        event_logger.log_session("first_backend", 1800.0, 12.5, 2.50)
         event_logger.log_session("third_backend", 7200.0, 50.0, 10.00)
 
         sessions = event_logger.get_sessions()
@@ -285,7 +258,7 @@ class TestEventLogger:
 
         # Verify timestamps are in order
         timestamps = [datetime.fromisoformat(session["timestamp"]) for session in sessions]
-        assert timestamps[0] <= timestamps[1] <= timestamps[2]
+        assert timestamps[0] < timestamps[1] < timestamps[2]
 
     @pytest.mark.unit
     def test_get_sessions_data_structure(self, event_logger):
@@ -359,15 +332,39 @@ class TestEventLogger:
         # Create first logger and log a session
         logger1 = EventLogger(temp_db_path)
         logger1.log_session("test_backend", 3600.0, 25.0, 5.0)
+        logger1.close()
 
         # Create second logger with same path
         logger2 = EventLogger(temp_db_path)
         sessions = logger2.get_sessions()
+        logger2.close()
 
         # Should retrieve the session logged by first logger
         assert len(sessions) == 1
         assert sessions[0]["backend_id"] == "test_backend"
 
+    @pytest.mark.unit
+    def test_schema_upgrade_adds_timestamp_index(self, temp_db_path):
+        """Test that a database created without the timestamp index gets it added."""
+        conn = sqlite3.connect(temp_db_path)
+        conn.execute(
+            "CREATE TABLE sessions (timestamp TEXT, backend_id TEXT, duration_s REAL, "
+            "energy_kwh REAL, revenue REAL)"
+        )
+        conn.execute("INSERT INTO sessions VALUES ('2023-01-01T12:00:00', 'old', 1.0, 2.0, 3.0)")
+        conn.commit()
+        conn.close()
+
+        logger = EventLogger(temp_db_path)
+
+        index = logger._conn.execute(
+            "SELECT name FROM sqlite_master WHERE type='index' AND name='idx_sessions_ts'"
+        ).fetchone()
+        sessions = logger.get_sessions()
+        logger.close()
+        assert index is not None
+        assert sessions[0]["backend_id"] == "old"
+
     @pytest.mark.unit
     def test_database_connection_handling(self, event_logger):
         """Test that database connections are properly handled."""
@@ -375,74 +372,83 @@ class TestEventLogger:
         for i in range(10):
             event_logger.log_session(f"backend_{i}", float(i * 100), float(i * 5), float(i))
 
-        # Get sessions multiple times
-        for _ in range(5):
-            sessions = event_logger.get_sessions()
-            assert len(sessions) == 10
-
-    @pytest.mark.unit
-    def test_log_session_with_float_precision(self, event_logger):
-        """Test logging session with high precision float values."""
-        event_logger.log_session(
-            backend_id="precision_backend",
-            duration_s=3600.123456789,
-            energy_kwh=25.987654321,
-            revenue=5.12345678901234567890,
-        )
+        gc.collect()
+        connections_before = _count_sqlite_connections()
 
         sessions = event_logger.get_sessions()
-        session = sessions[0]
+        assert len(sessions) == 10
+
+        # get_sessions must reuse the logger's connection rather than leak new ones
+        gc.collect()
+        assert _count_sqlite_connections() == connections_before
+
+    @pytest.mark.unit
+    def test_close_releases_connection(self, event_logger):
+        """Test that close() releases the long-lived database connection."""
+        event_logger.log_session("test_backend", 3600.0, 25.0, 5.0)
+        event_logger.close()
 
-        # Check that precision is maintained (within reasonable limits)
-        assert abs(session["duration_s"] - 3600.123456789) < 1e-6
-        assert abs(session["energy_kwh"] - 25.987654321) < 1e-6
-        assert abs(session["revenue"] - 5.12345678901234567890) < 1e-6
+        with pytest.raises(sqlite3.ProgrammingError):
+            event_logger.get_sessions()
 
     @pytest.mark.unit
-    @patch("src.ocpp_proxy.logger.datetime")
-    def test_log_session_timestamp_format(self, mock_datetime, event_logger):
+    @patch("src.ocpp_proxy.logger.time.time_ns")
+    def test_log_session_timestamp_format(self, mock_time_ns, event_logger):
         """Test that timestamp is in correct ISO format."""
-        # Mock datetime to return specific time
-        mock_now = Mock()
-        mock_now.isoformat.return_value = "2023-01-01T12:00:00.123456"
-        mock_datetime.datetime.utcnow.return_value = mock_now
+        # 2023-01-01T12:00:00.123456 UTC
+        mock_time_ns.return_value = 1672574400_123456_789
 
         event_logger.log_session("test_backend", 3600.0, 25.0, 5.0)
 
         sessions = event_logger.get_sessions()
-        assert sessions[0]["timestamp"] == "2023-01-01T12:00:00.123456"
+        assert sessions[0]["timestamp"] == "2023-01-01T12:00:00.123456+00:00"
+        assert datetime.fromisoformat(sessions[0]["timestamp"]) == datetime(
+            2023, 1, 1, 12, 0, 0, 123456, tzinfo=UTC
+        )
 
     @pytest.mark.unit
-    def test_database_error_handling(self, event_logger):
+    def test_database_error_handling(self, temp_db_path, monkeypatch):
         """Test handling of database errors."""
-        # Close the database file to simulate error
-        os.chmod(event_logger.db_path, 0o000)  # Make file unreadable
+        monkeypatch.setattr(
+            "src.ocpp_proxy.logger.sqlite3.connect",
+            Mock(side_effect=sqlite3.OperationalError("unable to open database file")),
+        )
 
-        try:
-            # This should raise an exception
-            with pytest.raises(sqlite3.OperationalError):
-                event_logger.log_session("test_backend", 3600.0, 25.0, 5.0)
-        finally:
-            # Restore permissions for cleanup
-            os.chmod(event_logger.db_path, 0o644)
+        # This should raise an exception
+        with pytest.raises(sqlite3.OperationalError):
+            EventLogger(temp_db_path)
 
     @pytest.mark.unit
-    def test_large_dataset_performance(self, event_logger):
+    @pytest.mark.parametrize(
+        ("in_memory", "max_log_time_ns", "max_retrieve_time_ns"),
+        [
+            # In-memory database has no fsync, so this run measures only CPU cost
+            (True, 250_000_000, 100_000_000),
+            (False, 2_000_000_000, 500_000_000),
+        ],
+        ids=["memory", "file"],
+    )
+    def test_large_dataset_performance(
+        self, temp_db_path, in_memory, max_log_time_ns, max_retrieve_time_ns
+    ):
         """Test performance with larger dataset."""
         import time
 
+        event_logger = EventLogger(":memory:" if in_memory else temp_db_path)
+
         # Log many sessions
-        start_time = time.time()
-        for i in range(1000):
-            event_logger.log_session(f"backend_{i}", float(i), float(i * 0.1), float(i * 0.01))
-        log_time = time.time() - start_time
+        rows = ((f"backend_{i}", float(i), float(i * 0.1), float(i * 0.01)) for i in range(1000))
+        start_time = time.perf_counter_ns()
+        event_logger.log_sessions_bulk(rows)
+        log_time_ns = time.perf_counter_ns() - start_time
 
         # Retrieve sessions
-        start_time = time.time()
+        start_time = time.perf_counter_ns()
         sessions = event_logger.get_sessions()
-        retrieve_time = time.time() - start_time
+        retrieve_time_ns = time.perf_counter_ns() - start_time
+        event_logger.close()
 
         assert len(sessions) == 1000
-        # Basic performance check (should complete in reasonable time)
-        assert log_time < 10.0  # Should log 1000 sessions in under 10 seconds
-        assert retrieve_time < 5.0  # Should retrieve 1000 sessions in under 5 seconds
+        # Basic performance check (monotonic clock, nanosecond resolution)
+        assert log_time_ns < max_log_time_ns
+        assert retrieve_time_ns < max_retrieve_time_ns
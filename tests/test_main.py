@@ -1,9 +1,15 @@
+import asyncio
 import os
-import tempfile
-from unittest.mock import AsyncMock, Mock, patch
+import re
+from contextlib import contextmanager
+from unittest.mock import AsyncMock, Mock, call, patch
 
+import orjson
 import pytest
-from aiohttp.test_utils import AioHTTPTestCase
+import pytest_asyncio
+import yaml
+from aiohttp import streams
+from aiohttp.test_utils import make_mocked_request
 
 from src.ocpp_proxy.main import (
     cleanup_app,
@@ -15,123 +21,189 @@ from src.ocpp_proxy.main import (
     welcome_handler,
 )
 
+_CONFIG_YAML = yaml.dump(
+    {
+        "allow_shared_charging": True,
+        "preferred_provider": "preferred_backend",
+        "rate_limit_seconds": 5,
+        "ocpp_services": [],
+    }
+)
 
-class TestMainApplication(AioHTTPTestCase):
-    """Integration tests for the main application."""
 
-    @pytest.fixture
-    def temp_config_file(self):
-        """Create a temporary configuration file."""
-        config_data = {
-            "allow_shared_charging": True,
-            "preferred_provider": "preferred_backend",
-            "rate_limit_seconds": 5,
-            "ocpp_services": [],
-        }
+async def _noop(*_args, **_kwargs):
+    return None
+
+
+async def _accepted(*_args, **_kwargs):
+    return {"status": "Accepted"}
+
+
+class _StubChargePoint:
+    """Charge point stand-in that accepts every remote request."""
+
+    ocpp_version = "1.6"
+    start = staticmethod(_noop)
+    send_remote_start_transaction = staticmethod(_accepted)
+    send_remote_stop_transaction = staticmethod(_accepted)
+
+
+_SENTINEL = object()
 
-        with tempfile.NamedTemporaryFile(mode="w", suffix=".yaml", delete=False) as f:
-            import yaml
 
-            yaml.dump(config_data, f)
-            config_path = f.name
+@contextmanager
+def _without_key(mapping, key):
+    """Remove ``key`` from ``mapping`` for the block and restore its original state on exit."""
+    value = mapping.pop(key, _SENTINEL)
+    try:
+        yield mapping
+    finally:
+        if value is _SENTINEL:
+            mapping.pop(key, None)
+        else:
+            mapping[key] = value
 
-        yield config_path
-        os.unlink(config_path)
 
-    async def get_application(self):
-        """Create application for testing."""
-        with patch.dict(os.environ, {"HA_URL": "", "HA_TOKEN": ""}):
-            with patch("src.ocpp_proxy.main.OCPPServiceManager") as mock_ocpp_manager:
-                mock_ocpp_manager.return_value.start_services = AsyncMock()
-                mock_ocpp_manager.return_value.get_service_status = Mock(return_value={})
-                return await init_app()
+async def _first_n_lines(response, n):
+    """Read a streamed response only until its first ``n`` lines are available."""
+    buf = b""
+    async for chunk in response.content.iter_any():
+        buf += chunk
+        if buf.count(b"\n") >= n:
+            break
+    # splitlines() also handles the csv module's \r\n line endings
+    return buf.decode().splitlines()[:n]
+
+
+@pytest.fixture(scope="module")
+def temp_config_file(tmp_path_factory):
+    """Create a temporary configuration file shared by the module."""
+    config_path = tmp_path_factory.mktemp("config") / "config.yaml"
+    config_path.write_text(_CONFIG_YAML)
+    return str(config_path)
+
+
+_MOCK_SESSIONS = (
+    {
+        "timestamp": "2023-01-01T12:00:00Z",
+        "backend_id": "test_backend",
+        "duration_s": 3600.0,
+        "energy_kwh": 25.0,
+        "revenue": 5.0,
+    },
+)
+
+# CSV rendering of _MOCK_SESSIONS: header + data
+_EXPECTED_CSV_LINES = (
+    "timestamp,backend_id,duration_s,energy_kwh,revenue",
+    "2023-01-01T12:00:00Z,test_backend,3600.0,25.0,5.0",
+)
+
+_REMOTE_START = {"action": "RemoteStartTransaction", "connector_id": 1, "id_tag": "RFID123"}
+
+# Title and endpoint links in the order the welcome page lists them
+_WELCOME_RE = re.compile(r"EV Charger Proxy.*?/charger.*?/backend.*?/sessions.*?/status", re.S)
+
+_ROUTE_PATHS = frozenset(
+    ["/", "/charger", "/backend", "/sessions", "/sessions.csv", "/status", "/override"]
+)
+
+
+@pytest.fixture
+def app(app_once, cp_slot):
+    """Give a test the session application and disconnect its charge point afterwards."""
+    yield app_once
+    cp_slot.value = None
+
+
+@pytest_asyncio.fixture(scope="module", loop_scope="session")
+async def init_app_cached(tmp_path_factory):
+    """Build one application per distinct environment and reuse it across tests."""
+    apps = {}
+
+    async def build(env):
+        key = frozenset(env.items())
+        if key not in apps:
+            # Keep each app's session database out of the working directory
+            db_path = tmp_path_factory.mktemp("init_app") / "usage_log.db"
+            with patch.dict(os.environ, {"LOG_DB_PATH": str(db_path), **env}):
+                apps[key] = await init_app()
+        return apps[key]
+
+    yield build
+    for app in apps.values():
+        await cleanup_app(app)
+
+
+@pytest_asyncio.fixture(scope="class", loop_scope="session")
+async def backend_ws(app_once, app_server, http_session, class_mocker):
+    """Open one backend WebSocket and reuse it for every dispatch case in the class."""
+    class_mocker.patch.object(app_once["backend_manager"], "subscribe")
+    class_mocker.patch.object(app_once["backend_manager"], "unsubscribe")
+    async with http_session.ws_connect(app_server.make_url("/backend?id=test_backend")) as ws:
+        yield ws
+
+
+@pytest.mark.asyncio(loop_scope="session")
+class TestMainApplication:
+    """Integration tests for the main application."""
 
     @pytest.mark.integration
-    async def test_welcome_handler(self):
+    async def test_welcome_handler(self, app_server, http_session):
         """Test the welcome page handler."""
-        request = await self.client.request("GET", "/")
+        request = await http_session.request("GET", app_server.make_url("/"))
         assert request.status == 200
 
         content = await request.text()
-        assert "EV Charger Proxy" in content
-        assert "/charger" in content
-        assert "/backend" in content
-        assert "/sessions" in content
-        assert "/status" in content
+        assert _WELCOME_RE.search(content)
 
     @pytest.mark.integration
-    async def test_sessions_json_empty(self):
+    async def test_sessions_json_empty(self, app, app_server, http_session, mocker):
         """Test sessions JSON endpoint with no sessions."""
-        with patch.object(self.app["event_logger"], "get_sessions", return_value=[]):
-            request = await self.client.request("GET", "/sessions")
-            assert request.status == 200
+        mocker.patch.object(app["event_logger"], "get_sessions", return_value=[])
 
-            data = await request.json()
-            assert data == []
+        request = await http_session.request("GET", app_server.make_url("/sessions"))
+        assert request.status == 200
+
+        data = await request.json(loads=orjson.loads)
+        assert data == []
 
     @pytest.mark.integration
-    async def test_sessions_json_with_data(self):
+    async def test_sessions_json_with_data(self, app, app_server, http_session, mocker):
         """Test sessions JSON endpoint with session data."""
-        mock_sessions = [
-            {
-                "timestamp": "2023-01-01T12:00:00Z",
-                "backend_id": "test_backend",
-                "duration_s": 3600.0,
-                "energy_kwh": 25.0,
-                "revenue": 5.0,
-            }
-        ]
-
-        with patch.object(self.app["event_logger"], "get_sessions", return_value=mock_sessions):
-            request = await self.client.request("GET", "/sessions")
-            assert request.status == 200
+        mocker.patch.object(app["event_logger"], "get_sessions", return_value=list(_MOCK_SESSIONS))
 
-            data = await request.json()
-            assert data == mock_sessions
+        request = await http_session.request("GET", app_server.make_url("/sessions"))
+        assert request.status == 200
+
+        data = await request.json(loads=orjson.loads)
+        assert data == list(_MOCK_SESSIONS)
 
     @pytest.mark.integration
-    async def test_sessions_csv_empty(self):
+    async def test_sessions_csv_empty(self, app, app_server, http_session, mocker):
         """Test sessions CSV endpoint with no sessions."""
-        with patch.object(self.app["event_logger"], "get_sessions", return_value=[]):
-            request = await self.client.request("GET", "/sessions.csv")
+        mocker.patch.object(app["event_logger"], "get_sessions", return_value=[])
+
+        async with http_session.request("GET", app_server.make_url("/sessions.csv")) as request:
             assert request.status == 200
             assert request.headers["Content-Type"].startswith("text/csv")
 
-            content = await request.text()
-            lines = content.strip().split("\n")
-            assert len(lines) == 1  # Just header
-            # Handle potential Windows line endings
-            header = lines[0].rstrip("\r")
-            assert header == "timestamp,backend_id,duration_s,energy_kwh,revenue"
+            lines = await _first_n_lines(request, 2)
+        assert tuple(lines) == _EXPECTED_CSV_LINES[:1]  # Just header
 
     @pytest.mark.integration
-    async def test_sessions_csv_with_data(self):
+    async def test_sessions_csv_with_data(self, app, app_server, http_session, mocker):
         """Test sessions CSV endpoint with session data."""
-        mock_sessions = [
-            {
-                "timestamp": "2023-01-01T12:00:00Z",
-                "backend_id": "test_backend",
-                "duration_s": 3600.0,
-                "energy_kwh": 25.0,
-                "revenue": 5.0,
-            }
-        ]
-
-        with patch.object(self.app["event_logger"], "get_sessions", return_value=mock_sessions):
-            request = await self.client.request("GET", "/sessions.csv")
+        mocker.patch.object(app["event_logger"], "get_sessions", return_value=list(_MOCK_SESSIONS))
+
+        async with http_session.request("GET", app_server.make_url("/sessions.csv")) as request:
             assert request.status == 200
 
-            content = await request.text()
-            lines = content.strip().split("\n")
-            assert len(lines) == 2  # Header + data
-            # Handle potential Windows line endings
-            header = lines[0].rstrip("\r")
-            data_line = lines[1].rstrip("\r")
-            assert header == "timestamp,backend_id,duration_s,energy_kwh,revenue"
-            assert data_line == "2023-01-01T12:00:00Z,test_backend,3600.0,25.0,5.0"
+            lines = await _first_n_lines(request, 3)
+        assert tuple(lines) == _EXPECTED_CSV_LINES
 
     @pytest.mark.integration
-    async def test_status_handler(self):
+    async def test_status_handler(self, app, app_server, http_session, mocker):
         """Test the status handler."""
         # Mock backend manager status
         mock_status = {
@@ -140,221 +212,156 @@ class TestMainApplication(AioHTTPTestCase):
             "ocpp_services": {"service1": {"connected": True}},
         }
 
-        with patch.object(
-            self.app["backend_manager"], "get_backend_status", return_value=mock_status
-        ):
-            request = await self.client.request("GET", "/status")
-            assert request.status == 200
+        mocker.patch.object(app["backend_manager"], "get_backend_status", return_value=mock_status)
 
-            data = await request.json()
-            assert data == mock_status
+        request = await http_session.request("GET", app_server.make_url("/status"))
+        assert request.status == 200
+
+        data = await request.json(loads=orjson.loads)
+        assert data == mock_status
 
     @pytest.mark.integration
-    async def test_override_handler_success(self):
+    async def test_override_handler_success(self, app, app_server, http_session, mocker):
         """Test the override handler with successful override."""
-        with patch.object(self.app["backend_manager"], "release_control") as mock_release:
-            with patch.object(
-                self.app["backend_manager"], "request_control", return_value=True
-            ) as mock_request:
-                request = await self.client.request(
-                    "POST", "/override", json={"backend_id": "test_backend"}
-                )
-                assert request.status == 200
+        mock_release = mocker.patch.object(app["backend_manager"], "release_control")
+        mock_request = mocker.patch.object(
+            app["backend_manager"], "request_control", return_value=True
+        )
+
+        request = await http_session.request(
+            "POST", app_server.make_url("/override"), json={"backend_id": "test_backend"}
+        )
+        assert request.status == 200
 
-                data = await request.json()
-                assert data["success"]
+        data = await request.json(loads=orjson.loads)
+        assert data["success"]
 
-                mock_release.assert_called_once()
-                mock_request.assert_called_once_with("test_backend")
+        mock_release.assert_called_once()
+        mock_request.assert_called_once_with("test_backend")
 
     @pytest.mark.integration
-    async def test_override_handler_failure(self):
+    async def test_override_handler_failure(self, app, app_server, http_session, mocker):
         """Test the override handler with failed override."""
-        with patch.object(self.app["backend_manager"], "release_control") as mock_release:
-            with patch.object(
-                self.app["backend_manager"], "request_control", return_value=False
-            ) as mock_request:
-                request = await self.client.request(
-                    "POST", "/override", json={"backend_id": "test_backend"}
-                )
-                assert request.status == 200
+        mock_release = mocker.patch.object(app["backend_manager"], "release_control")
+        mock_request = mocker.patch.object(
+            app["backend_manager"], "request_control", return_value=False
+        )
+
+        request = await http_session.request(
+            "POST", app_server.make_url("/override"), json={"backend_id": "test_backend"}
+        )
+        assert request.status == 200
 
-                data = await request.json()
-                assert not data["success"]
+        data = await request.json(loads=orjson.loads)
+        assert not data["success"]
 
-                mock_release.assert_called_once()
-                mock_request.assert_called_once_with("test_backend")
+        mock_release.assert_called_once()
+        mock_request.assert_called_once_with("test_backend")
 
     @pytest.mark.integration
-    async def test_override_handler_invalid_json(self):
-        """Test the override handler with invalid JSON."""
-        request = await self.client.request("POST", "/override", data="invalid json")
-        assert request.status == 400
-
-    @pytest.mark.integration
-    async def test_charger_handler_websocket(self):
+    async def test_charger_handler_websocket(self, app, app_server, http_session, mocker):
         """Test the charger WebSocket handler."""
         # This is a complex test as it involves WebSocket connections
         # We'll mock the WebSocket and ChargePoint
-        with patch("src.ocpp_proxy.main.ChargePointFactory.create_charge_point") as mock_cp_factory:
-            mock_cp = Mock()
-            mock_cp.start = AsyncMock()
-            mock_cp_factory.return_value = mock_cp
-
+        stub_cp = _StubChargePoint()
+        mocker.patch(
+            "src.ocpp_proxy.main.ChargePointFactory.create_charge_point",
+            return_value=stub_cp,
+        )
+        set_charge_point = mocker.spy(app["ocpp_service_manager"], "set_charge_point")
+
+        # The handler stores its charge point on the shared app; drop it afterwards
+        with _without_key(app, "charge_point"):
             # Create a mock WebSocket connection
-            async with self.client.ws_connect("/charger") as ws:
+            async with http_session.ws_connect(app_server.make_url("/charger")) as ws:
                 # The connection should be established
                 assert not ws.closed
 
-                # Close the connection
+                # The stub charge point returns at once, so the server closes the socket
+                await ws.receive()
                 await ws.close()
 
-    @pytest.mark.integration
-    async def test_backend_handler_websocket(self):
-        """Test the backend WebSocket handler."""
-        with patch.object(self.app["backend_manager"], "subscribe") as mock_subscribe:
-            with patch.object(self.app["backend_manager"], "unsubscribe"):
-                with patch.object(
-                    self.app["backend_manager"], "request_control", return_value=True
-                ) as mock_request:
-                    # Create a mock charge point
-                    mock_cp = Mock()
-                    mock_cp.send_remote_start_transaction = AsyncMock()
-                    # Create a JSON-serializable mock result
-                    mock_result = {"status": "Accepted"}
-                    mock_cp.send_remote_start_transaction.return_value = mock_result
-
-                    self.app["charge_point"] = mock_cp
-
-                    # Connect to backend endpoint
-                    async with self.client.ws_connect("/backend?id=test_backend") as ws:
-                        # Send a remote start transaction request
-                        await ws.send_json(
-                            {
-                                "action": "RemoteStartTransaction",
-                                "connector_id": 1,
-                                "id_tag": "RFID123",
-                            }
-                        )
-
-                        # Receive response
-                        response = await ws.receive_json()
-
-                        assert response["action"] == "RemoteStartTransaction"
-                        assert response["result"]["status"] == "Accepted"
-
-                        # Check that subscribe was called with the correct backend ID
-                        # (WebSocket object type differs between client and server)
-                        mock_subscribe.assert_called_once()
-                        assert mock_subscribe.call_args[0][0] == "test_backend"
-                        mock_request.assert_called_once_with("test_backend")
-
-    @pytest.mark.integration
-    async def test_backend_handler_remote_stop_transaction(self):
-        """Test backend handler remote stop transaction."""
-        with patch.object(self.app["backend_manager"], "subscribe"):
-            with patch.object(self.app["backend_manager"], "unsubscribe"):
-                # Create a mock charge point
-                mock_cp = Mock()
-                mock_cp.send_remote_stop_transaction = AsyncMock()
-                # Create a JSON-serializable mock result
-                mock_result = {"status": "Accepted"}
-                mock_cp.send_remote_stop_transaction.return_value = mock_result
-
-                self.app["charge_point"] = mock_cp
-
-                # Connect to backend endpoint
-                async with self.client.ws_connect("/backend?id=test_backend") as ws:
-                    # Send a remote stop transaction request
-                    await ws.send_json({"action": "RemoteStopTransaction", "transaction_id": 123})
-
-                    # Receive response
-                    response = await ws.receive_json()
-
-                    assert response["action"] == "RemoteStopTransaction"
-                    assert response["result"]["status"] == "Accepted"
-
-    @pytest.mark.integration
-    async def test_backend_handler_control_denied(self):
-        """Test backend handler when control is denied."""
-        with patch.object(self.app["backend_manager"], "subscribe"):
-            with patch.object(self.app["backend_manager"], "unsubscribe"):
-                with patch.object(
-                    self.app["backend_manager"], "request_control", return_value=False
-                ):
-                    # Create a mock charge point
-                    mock_cp = Mock()
-                    self.app["charge_point"] = mock_cp
-
-                    # Connect to backend endpoint
-                    async with self.client.ws_connect("/backend?id=test_backend") as ws:
-                        # Send a remote start transaction request
-                        await ws.send_json(
-                            {
-                                "action": "RemoteStartTransaction",
-                                "connector_id": 1,
-                                "id_tag": "RFID123",
-                            }
-                        )
-
-                        # Receive response
-                        response = await ws.receive_json()
-
-                        assert response["error"] == "control_locked"
-
-    @pytest.mark.integration
-    async def test_backend_handler_unknown_action(self):
-        """Test backend handler with unknown action."""
-        with patch.object(self.app["backend_manager"], "subscribe"):
-            with patch.object(self.app["backend_manager"], "unsubscribe"):
-                # Connect to backend endpoint
-                async with self.client.ws_connect("/backend?id=test_backend") as ws:
-                    # Send unknown action
-                    await ws.send_json({"action": "UnknownAction", "some_param": "value"})
-
-                    # Receive response
-                    response = await ws.receive_json()
+            # The disconnected charge point is no longer offered to backend control requests
+            assert "charge_point" not in app
 
-                    assert response["error"] == "unknown_action"
+        # The charge point is handed to the service manager and cleared on disconnect
+        assert set_charge_point.call_args_list == [call(stub_cp), call(None)]
 
     @pytest.mark.integration
-    async def test_backend_handler_no_charge_point(self):
-        """Test backend handler when no charge point is connected."""
-        with patch.object(self.app["backend_manager"], "subscribe"):
-            with patch.object(self.app["backend_manager"], "unsubscribe"):
-                with patch.object(
-                    self.app["backend_manager"], "request_control", return_value=True
-                ):
-                    # No charge point in app
-                    self.app.pop("charge_point", None)
-
-                    # Connect to backend endpoint
-                    async with self.client.ws_connect("/backend?id=test_backend") as ws:
-                        # Send a remote start transaction request
-                        await ws.send_json(
-                            {
-                                "action": "RemoteStartTransaction",
-                                "connector_id": 1,
-                                "id_tag": "RFID123",
-                            }
-                        )
-
-                        # Receive response
-                        response = await ws.receive_json()
-
-                        assert response["error"] == "unknown_action"
+    @pytest.mark.parametrize(
+        ("control_allowed", "with_charge_point", "requests_control", "exchanges"),
+        [
+            (
+                True,
+                True,
+                True,
+                [
+                    (
+                        _REMOTE_START,
+                        {"action": "RemoteStartTransaction", "result": {"status": "Accepted"}},
+                    ),
+                    (
+                        {"action": "RemoteStopTransaction", "transaction_id": 123},
+                        {"action": "RemoteStopTransaction", "result": {"status": "Accepted"}},
+                    ),
+                    (
+                        {"action": "UnknownAction", "some_param": "value"},
+                        {"error": "unknown_action"},
+                    ),
+                ],
+            ),
+            (False, True, True, [(_REMOTE_START, {"error": "control_locked"})]),
+            # Without a charge point the request is rejected before control is requested
+            (True, False, False, [(_REMOTE_START, {"error": "unknown_action"})]),
+        ],
+        ids=["control_allowed", "control_denied", "no_charge_point"],
+    )
+    async def test_backend_dispatch(
+        self,
+        app,
+        cp_slot,
+        backend_ws,
+        mocker,
+        control_allowed,
+        with_charge_point,
+        requests_control,
+        exchanges,
+    ):
+        """Test backend handler responses pipelined over a shared WebSocket connection."""
+        cp_slot.value = _StubChargePoint() if with_charge_point else None
+
+        mock_request = mocker.patch.object(
+            app["backend_manager"], "request_control", return_value=control_allowed
+        )
+
+        # Send every frame before reading any reply; the handler answers in order
+        for payload, _ in exchanges:
+            await backend_ws.send_str(orjson.dumps(payload).decode())
+        responses = [orjson.loads(await backend_ws.receive_str()) for _ in exchanges]
+
+        assert responses == [expected for _, expected in exchanges]
+        if requests_control:
+            mock_request.assert_called_once_with("test_backend")
+        else:
+            mock_request.assert_not_called()
 
     @pytest.mark.integration
-    async def test_backend_handler_default_id(self):
-        """Test backend handler with default backend ID."""
-        with patch.object(self.app["backend_manager"], "subscribe") as mock_subscribe:
-            with patch.object(self.app["backend_manager"], "unsubscribe"):
-                # Connect without ID parameter
-                async with self.client.ws_connect("/backend"):
-                    # Should use 'unknown' as default ID
-                    # (WebSocket object type differs between client and server)
-                    mock_subscribe.assert_called_once()
-                    assert mock_subscribe.call_args[0][0] == "unknown"
+    @pytest.mark.parametrize(
+        ("path", "backend_id"),
+        [("/backend?id=test_backend", "test_backend"), ("/backend", "unknown")],
+        ids=["explicit_id", "default_id"],
+    )
+    async def test_backend_handler_subscribe(
+        self, app, app_server, http_session, mocker, path, backend_id
+    ):
+        """Test backend handler subscribes with the requested or default backend ID."""
+        mock_subscribe = mocker.patch.object(app["backend_manager"], "subscribe")
+        mocker.patch.object(app["backend_manager"], "unsubscribe")
+
+        async with http_session.ws_connect(app_server.make_url(path)):
+            # (WebSocket object type differs between client and server)
+            mock_subscribe.assert_called_once()
+            assert mock_subscribe.call_args[0][0] == backend_id
 
 
 class TestMainApplicationHandlers:
@@ -388,12 +395,7 @@ class TestMainApplicationHandlers:
         assert response.content_type == "text/html"
 
         # Check that HTML content contains expected elements
-        html_content = response.text
-        assert "EV Charger Proxy" in html_content
-        assert "/charger" in html_content
-        assert "/backend" in html_content
-        assert "/sessions" in html_content
-        assert "/status" in html_content
+        assert _WELCOME_RE.search(response.text)
 
     @pytest.mark.unit
     @pytest.mark.asyncio
@@ -413,28 +415,15 @@ class TestMainApplicationHandlers:
     async def test_sessions_csv_unit(self, mock_request, mock_app_components):
         """Unit test for sessions CSV handler."""
         mock_request.app = mock_app_components
-        mock_sessions = [
-            {
-                "timestamp": "2023-01-01T12:00:00Z",
-                "backend_id": "test_backend",
-                "duration_s": 3600.0,
-                "energy_kwh": 25.0,
-                "revenue": 5.0,
-            }
-        ]
-        mock_app_components["event_logger"].get_sessions.return_value = mock_sessions
+        mock_app_components["event_logger"].get_sessions.return_value = list(_MOCK_SESSIONS)
 
         response = await sessions_csv(mock_request)
 
         assert response.status == 200
         assert response.content_type == "text/csv"
 
-        # Check CSV content
-        content = response.text
-        lines = content.strip().split("\n")
-        assert len(lines) == 2  # Header + data
-        assert "timestamp,backend_id,duration_s,energy_kwh,revenue" in lines[0]
-        assert "2023-01-01T12:00:00Z,test_backend,3600.0,25.0,5.0" in lines[1]
+        # Check CSV content (header + data)
+        assert tuple(response.text.splitlines()) == _EXPECTED_CSV_LINES
 
     @pytest.mark.unit
     @pytest.mark.asyncio
@@ -472,6 +461,19 @@ class TestMainApplicationHandlers:
         mock_manager.release_control.assert_called_once()
         mock_manager.request_control.assert_called_once_with("test_backend")
 
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    async def test_override_handler_invalid_json(self):
+        """Unit test for override handler with invalid JSON."""
+        payload = streams.StreamReader(Mock(), 2**16, loop=asyncio.get_running_loop())
+        payload.feed_data(b"invalid json")
+        payload.feed_eof()
+        request = make_mocked_request("POST", "/override", payload=payload)
+
+        response = await override_handler(request)
+
+        assert response.status == 400
+
     @pytest.mark.unit
     @pytest.mark.asyncio
     async def test_cleanup_app_unit(self, mock_app_components):
@@ -498,94 +500,55 @@ class TestMainApplicationInitialization:
 
     @pytest.mark.integration
     @pytest.mark.asyncio
-    async def test_init_app_with_ha_environment(self):
-        """Test app initialization with HA environment variables."""
-        with patch.dict(os.environ, {"HA_URL": "http://ha.local", "HA_TOKEN": "token123"}):
-            with patch("src.ocpp_proxy.main.OCPPServiceManager") as mock_ocpp_manager:
-                mock_ocpp_manager.return_value.start_services = AsyncMock()
-
-                app = await init_app()
-
-                assert app["ha_bridge"] is not None
-                assert app["backend_manager"] is not None
-                assert app["event_logger"] is not None
-                assert app["ocpp_service_manager"] is not None
+    @pytest.mark.parametrize(
+        ("env", "assertion"),
+        [
+            (
+                {"HA_URL": "http://ha.local", "HA_TOKEN": "token123"},
+                lambda app: app["ha_bridge"] is not None,
+            ),
+            ({"HA_URL": "", "HA_TOKEN": ""}, lambda app: app["ha_bridge"] is None),
+            (
+                {"HA_URL": "", "HA_TOKEN": ""},
+                lambda app: _ROUTE_PATHS.issubset(
+                    route.resource.canonical for route in app.router.routes()
+                ),
+            ),
+        ],
+        ids=["with_ha_environment", "without_ha_environment", "route_registration"],
+    )
+    async def test_init_app(self, init_app_cached, env, assertion):
+        """Test app initialization components and routes for a given environment."""
+        app = await init_app_cached(env)
+
+        assert assertion(app)
+        assert app["backend_manager"] is not None
+        assert app["event_logger"] is not None
+        assert app["ocpp_service_manager"] is not None
 
     @pytest.mark.integration
     @pytest.mark.asyncio
-    async def test_init_app_without_ha_environment(self):
-        """Test app initialization without HA environment variables."""
-        with patch.dict(os.environ, {"HA_URL": "", "HA_TOKEN": ""}, clear=True):
-            with patch("src.ocpp_proxy.main.OCPPServiceManager") as mock_ocpp_manager:
-                mock_ocpp_manager.return_value.start_services = AsyncMock()
-
-                app = await init_app()
-
-                assert app["ha_bridge"] is None
-                assert app["backend_manager"] is not None
-                assert app["event_logger"] is not None
-                assert app["ocpp_service_manager"] is not None
-
-    @pytest.mark.integration
-    @pytest.mark.asyncio
-    async def test_init_app_custom_db_path(self):
+    async def test_init_app_custom_db_path(self, monkeypatch, mocker):
         """Test app initialization with custom database path."""
-        with patch.dict(os.environ, {"LOG_DB_PATH": "/custom/path/log.db"}):
-            with patch("src.ocpp_proxy.main.OCPPServiceManager") as mock_ocpp_manager:
-                mock_ocpp_manager.return_value.start_services = AsyncMock()
+        monkeypatch.setenv("LOG_DB_PATH", "/custom/path/log.db")
+        mock_logger = mocker.patch("src.ocpp_proxy.main.EventLogger")
 
-                with patch("src.ocpp_proxy.main.EventLogger") as mock_logger:
-                    await init_app()
+        await init_app()
 
-                    mock_logger.assert_called_once_with(db_path="/custom/path/log.db")
+        mock_logger.assert_called_once_with(db_path="/custom/path/log.db")
 
     @pytest.mark.integration
     @pytest.mark.asyncio
-    async def test_init_app_route_registration(self):
-        """Test that all routes are registered correctly."""
-        with patch("src.ocpp_proxy.main.OCPPServiceManager") as mock_ocpp_manager:
-            mock_ocpp_manager.return_value.start_services = AsyncMock()
-
-            app = await init_app()
-
-            # Check that routes are registered
-            route_paths = [route.resource.canonical for route in app.router.routes()]
-
-            assert "/" in route_paths
-            assert "/charger" in route_paths
-            assert "/backend" in route_paths
-            assert "/sessions" in route_paths
-            assert "/sessions.csv" in route_paths
-            assert "/status" in route_paths
-            assert "/override" in route_paths
-
-    @pytest.mark.integration
-    @pytest.mark.asyncio
-    async def test_init_app_ocpp_service_startup(self):
+    async def test_init_app_ocpp_service_startup(self, monkeypatch, mocker, tmp_path):
         """Test that OCPP services are started during initialization."""
-        with patch("src.ocpp_proxy.main.OCPPServiceManager") as mock_ocpp_manager:
-            mock_manager_instance = Mock()
-            mock_manager_instance.start_services = AsyncMock()
-            mock_ocpp_manager.return_value = mock_manager_instance
-
-            await init_app()
-
-            # Should start OCPP services
-            mock_manager_instance.start_services.assert_called_once()
+        monkeypatch.setenv("LOG_DB_PATH", str(tmp_path / "usage_log.db"))
+        mock_manager_instance = Mock()
+        mock_manager_instance.start_services = AsyncMock()
+        mock_manager_instance.stop_all_services = AsyncMock()
+        mocker.patch("src.ocpp_proxy.main.OCPPServiceManager", return_value=mock_manager_instance)
 
-    @pytest.mark.integration
-    @pytest.mark.asyncio
-    async def test_init_app_backend_manager_app_reference(self):
-        """Test that backend manager gets app reference."""
-        with patch("src.ocpp_proxy.main.OCPPServiceManager") as mock_ocpp_manager:
-            mock_ocpp_manager.return_value.start_services = AsyncMock()
-
-            with patch("src.ocpp_proxy.main.BackendManager") as mock_backend_manager:
-                mock_manager_instance = Mock()
-                mock_manager_instance.set_app_reference = Mock()
-                mock_backend_manager.return_value = mock_manager_instance
+        app = await init_app()
 
-                app = await init_app()
-
-                # Should set app reference
-                mock_manager_instance.set_app_reference.assert_called_once_with(app)
+        # Should start OCPP services
+        mock_manager_instance.start_services.assert_called_once()
+        await cleanup_app(app)